@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import os, uuid
 from pathlib import Path
 import matplotlib.pyplot as plt
 import chatbot as mca_chat
+from live_data import LIVE_SNAPSHOT, LIVE_LOG, data_version, mtime, apply_live
+from result_view import ResultView
 
 
 # ---------- paths ----------
@@ -12,6 +15,7 @@ P_PRO = BASE / "data" / "processed"
 P_LOG = BASE / "data" / "change_logs"
 P_ENR = BASE / "data" / "enriched"
 P_SUM = BASE / "data"
+P_EXP = BASE / "data" / "exports"
 
 st.set_page_config(page_title="MCA Insights Engine", layout="wide")
 st.title("MCA Insights Engine")
@@ -22,39 +26,135 @@ def _read_csv(path):
     df = pd.read_csv(path, low_memory=False)
     return df
 
-@st.cache_data
-def load_all():
-    d1 = _read_csv(P_PRO/"master_day1.csv")
-    d2 = _read_csv(P_PRO/"master_day2.csv")
-    d3 = _read_csv(P_PRO/"master_day3.csv")
-
+def _prep_snapshot(df):
     # normalize date/year safely
-    for df in (d1, d2, d3):
-        if "date_of_incorporation" in df.columns:
-            df["date_of_incorporation"] = pd.to_datetime(df["date_of_incorporation"], errors="coerce")
-            yr = pd.to_numeric(df["date_of_incorporation"].dt.year, errors="coerce")
-            df["year"] = yr.astype("Int64")
-
-        # ensure string columns are strings
-        for c in ["cin", "company_name", "state", "company_status"]:
-            if c in df.columns:
-                df[c] = df[c].astype(str)
-
-    cl2 = _read_csv(P_LOG/"change_log_day2.csv")
-    cl3 = _read_csv(P_LOG/"change_log_day3.csv")
-    for cl in (cl2, cl3):
-        if not cl.empty:
-            cl.columns = [c.strip().lower() for c in cl.columns]
-            if "date" not in cl.columns:
-                cl["date"] = pd.NaT
-
-    enr = _read_csv(P_ENR/"enriched_dataset.csv")
+    if "date_of_incorporation" in df.columns:
+        df["date_of_incorporation"] = pd.to_datetime(df["date_of_incorporation"], errors="coerce")
+        yr = pd.to_numeric(df["date_of_incorporation"].dt.year, errors="coerce")
+        df["year"] = yr.astype("Int64")
+
+    # ensure string columns are strings
+    for c in ["cin", "company_name", "state", "company_status"]:
+        if c in df.columns:
+            df[c] = df[c].astype(str)
+    return df
+
+def _prep_log(cl):
+    if not cl.empty:
+        cl.columns = [c.strip().lower() for c in cl.columns]
+        if "date" not in cl.columns:
+            cl["date"] = pd.NaT
+    return cl
+
+BASE_FILES = [P_PRO/"master_day1.csv", P_PRO/"master_day2.csv", P_PRO/"master_day3.csv",
+              P_LOG/"change_log_day2.csv", P_LOG/"change_log_day3.csv", P_ENR/"enriched_dataset.csv"]
+
+@st.cache_data(max_entries=1)
+def load_base(mtimes):
+    # full-rebuild outputs, keyed on their mtimes so watcher drops never re-read them
+    d1, d2, d3 = (_prep_snapshot(_read_csv(p)) for p in BASE_FILES[:3])
+    cl2, cl3 = (_prep_log(_read_csv(p)) for p in BASE_FILES[3:5])
+
+    enr = _read_csv(BASE_FILES[5])
     if not enr.empty:
         enr.columns = [c.strip().lower() for c in enr.columns]
 
     return d1, d2, d3, cl2, cl3, enr
 
-d1, d2, d3, cl2, cl3, enr = load_all()
+@st.cache_data(max_entries=2)
+def load_all(version, mtimes):
+    # `version` is the data stamp written by watch_raw.py; a new value only
+    # re-reads the small live files and layers them over the cached base
+    d1, d2, d3, cl2, cl3, enr = load_base(mtimes)
+    d3 = apply_live(d3, _prep_snapshot(_read_csv(LIVE_SNAPSHOT)))
+    # watcher changes are kept apart from the simulated Day2/Day3 diffs
+    cl_live = _prep_log(_read_csv(LIVE_LOG))
+    return d1, d2, d3, cl2, cl3, cl_live, enr
+
+# watcher stamp + base-file mtimes: changes whenever any loaded frame can change
+DATA_KEY = (data_version(), tuple(mtime(p) for p in BASE_FILES))
+d1, d2, d3, cl2, cl3, cl_live, enr = load_all(*DATA_KEY)
+
+# presorted views live across reruns; only the current data's two views are kept
+@st.cache_resource(max_entries=2)
+def get_view(name, data_key):
+    # a rebuild means new data: drop selections still pointing at old views
+    search_sel.clear(); enriched_sel.clear()
+    return ResultView({"d3": d3, "enr": enr}[name])
+
+# selections are cached objects so their sorted ranks survive page changes
+@st.cache_resource(max_entries=4)
+def search_sel(data_key, q, year_sel, state_sel, status_sel):
+    v = get_view("d3", data_key)
+    z = v.df
+    m = np.ones(len(z), dtype=bool)
+    if q:
+        t = q.strip().upper()
+        m &= (z["cin"].astype(str).str.upper().str.contains(t) |
+              z["company_name"].astype(str).str.upper().str.contains(t, na=False)).to_numpy()
+    if year_sel != "All" and "year" in z.columns:
+        m &= (pd.to_numeric(z["year"], errors="coerce").astype("Int64") == int(year_sel)).fillna(False).to_numpy()
+    if state_sel != "All":
+        m &= (z["state"] == state_sel).to_numpy()
+    if status_sel != "All":
+        m &= (z["company_status"] == status_sel).to_numpy()
+    return v.select(m)
+
+@st.cache_resource(max_entries=4)
+def enriched_sel(data_key, src, sec):
+    v = get_view("enr", data_key)
+    z = v.df
+    m = np.ones(len(z), dtype=bool)
+    if src != "All": m &= (z["source"] == src).to_numpy()
+    if sec != "All" and "sector" in z.columns: m &= (z["sector"] == sec).to_numpy()
+    return v.select(m)
+
+def show_result(sel, key, filters):
+    """Sort / page / export controls for a filtered selection.
+
+    `filters` identifies the selection (data key + filter values); an export
+    is only offered for download while it still matches filters and sort.
+    """
+    sorts = sel.view.sorts()
+    c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+    with c1:
+        sort_lbl = st.selectbox("Sort by", ["Default"] + list(sorts), key=f"{key}_sort")
+    with c2:
+        desc = st.checkbox("Descending", key=f"{key}_desc", disabled=sort_lbl == "Default")
+    with c3:
+        size = st.selectbox("Page size", [50, 100, 300, 1000], index=2, key=f"{key}_size")
+    with c4:
+        page = st.number_input("Page", min_value=1, value=1, step=1, key=f"{key}_page")
+    col = sorts.get(sort_lbl)
+    page = min(int(page), sel.n_pages(size))
+
+    st.write(f"Rows: {len(sel)}  ·  page {page} of {sel.n_pages(size)}")
+    st.dataframe(sel.page(page - 1, size, col, desc), use_container_width=True)
+
+    # one export file per session and format; written to .tmp and swapped in
+    sid = st.session_state.setdefault("export_id", uuid.uuid4().hex[:12])
+    spec = (filters, col, bool(desc))
+    for box, fmt in zip(st.columns(2), ["csv", "parquet"]):
+        out = P_EXP / f"{key}_{sid}.{fmt}"
+        built_for = f"{key}_{fmt}_spec"
+        with box:
+            if st.button(f"Prepare full export ({fmt.upper()})", key=f"{key}_{fmt}"):
+                tmp = out.with_name(out.name + ".tmp")
+                try:
+                    n = getattr(sel, f"to_{fmt}")(tmp, col=col, descending=desc)
+                    os.replace(tmp, out)
+                    st.session_state[built_for] = spec
+                    st.success(f"{n} rows ready")
+                except RuntimeError as e:
+                    st.warning(str(e))
+            if out.exists() and st.session_state.get(built_for) != spec:
+                # built for another filter/sort: drop it rather than serve stale rows
+                out.unlink(missing_ok=True)
+                st.session_state.pop(built_for, None)
+            if out.exists():
+                with open(out, "rb") as f:
+                    st.download_button(f"Download {fmt.upper()}", f, file_name=f"{key}_result.{fmt}",
+                                       key=f"{key}_{fmt}_dl")
 
 def uniq(values):
     s = pd.Series(values).dropna().astype(str)
@@ -82,27 +182,14 @@ with tab1:
     with col4:
         status_sel = st.selectbox("Status", ["All"] + uniq(d3.get("company_status", []))) if not d3.empty else "All"
 
-    z = d3.copy()
-    if q:
-        t = q.strip().upper()
-        z = z[
-            z["cin"].astype(str).str.upper().str.contains(t) |
-            z["company_name"].astype(str).str.upper().str.contains(t, na=False)
-        ]
-    if year_sel != "All" and "year" in z.columns:
-        z = z[pd.to_numeric(z["year"], errors="coerce").astype("Int64") == int(year_sel)]
-    if state_sel != "All":
-        z = z[z["state"] == state_sel]
-    if status_sel != "All":
-        z = z[z["company_status"] == status_sel]
-
-    st.write(f"Rows: {len(z)}")
-    st.dataframe(z.head(300), use_container_width=True)
+    if not d3.empty:
+        filters = (DATA_KEY, q, year_sel, state_sel, status_sel)
+        show_result(search_sel(*filters), "search", filters)
 
     # show change history for a single CIN query (if provided)
-    if q and (not cl2.empty or not cl3.empty):
+    if q and (not cl2.empty or not cl3.empty or not cl_live.empty):
         t = q.strip().upper()
-        ch = pd.concat([cl2, cl3], ignore_index=True)
+        ch = pd.concat([cl2, cl3, cl_live], ignore_index=True)
         ch = ch[ch["cin"].astype(str).str.upper() == t] if "cin" in ch.columns else pd.DataFrame()
         if not ch.empty:
             st.subheader("Change history for selection")
@@ -110,10 +197,11 @@ with tab1:
 
 # --- Change History tab ---
 with tab2:
-    if cl2.empty and cl3.empty:
+    if cl2.empty and cl3.empty and cl_live.empty:
         st.info("No change logs found.")
     else:
-        ch = pd.concat([cl2.assign(day="Day2"), cl3.assign(day="Day3")], ignore_index=True)
+        ch = pd.concat([cl2.assign(day="Day2"), cl3.assign(day="Day3"), cl_live.assign(day="Live")],
+                       ignore_index=True)
         if "change_type" in ch.columns:
             g = ch.groupby(["day", "change_type"]).size().rename("count").reset_index()
             pivot = g.pivot(index="day", columns="change_type", values="count").fillna(0).astype(int)
@@ -137,11 +225,8 @@ with tab3:
             src = st.selectbox("Source", ["All"] + uniq(enr.get("source", [])))
         with c2:
             sec = st.selectbox("Sector", ["All"] + uniq(enr.get("sector", []))) if "sector" in enr.columns else "All"
-        ez = enr.copy()
-        if src != "All": ez = ez[ez["source"] == src]
-        if sec != "All" and "sector" in ez.columns: ez = ez[ez["sector"] == sec]
-        st.write(f"Rows: {len(ez)}")
-        st.dataframe(ez.head(300), use_container_width=True)
+        filters = (DATA_KEY, src, sec)
+        show_result(enriched_sel(*filters), "enriched", filters)
 
 # --- Daily Summaries tab ---
 with tab4:
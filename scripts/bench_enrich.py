@@ -0,0 +1,58 @@
+import pandas as pd, numpy as np, time, argparse
+from contextlib import redirect_stdout
+import io
+
+from enrich_data import pick_ids, enrich_mock, select_ids, enrich_batches
+
+# ---------- synthetic data ----------
+def make_data(n_rows, n_changes, seed=0):
+    rng = np.random.default_rng(seed)
+    cin = np.array([f"U{i:06d}MH2020PTC{i % 997:06d}" for i in range(n_rows)], dtype=object)
+    d3 = pd.DataFrame({
+        "cin": cin,
+        "company_name": [f"Company {i}" for i in range(n_rows)],
+        "company_status": rng.choice(["Active","Strike Off","Dormant"], size=n_rows),
+        "state": rng.choice(["Maharashtra","Karnataka","Delhi"], size=n_rows),
+        "nic_code": rng.integers(100, 9999, size=n_rows).astype(str),
+    })
+    # change log: mostly snapshot CINs plus some that were deregistered
+    picked = rng.choice(cin, size=n_changes, replace=False)
+    gone = np.array([f"GONE{i:06d}" for i in range(n_changes // 10)], dtype=object)
+    cl = pd.DataFrame({"cin": np.concatenate([picked, gone])})
+    return d3, cl
+
+def timed(fn):
+    t0 = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        out = fn()
+    return out, time.perf_counter() - t0
+
+def loop_path(cl, d3, k):
+    # pick_ids caps at 100, so slice the same candidates for the loop
+    s = set(d3["cin"].astype(str))
+    ids = [x for x in cl["cin"].astype(str).unique().tolist() if x in s][:k]
+    return enrich_mock(ids, d3)
+
+def batch_path(cl, d3, k):
+    return pd.concat(enrich_batches(select_ids(cl, d3, limit=k), d3), ignore_index=True)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark per-CIN vs batched enrichment.")
+    ap.add_argument("--rows", type=int, default=500_000, help="snapshot rows")
+    ap.add_argument("--sizes", default="100,1000,10000,30000", help="CINs to enrich")
+    a = ap.parse_args()
+
+    sizes = [int(x) for x in a.sizes.split(",")]
+    d3, cl = make_data(a.rows, max(sizes))
+    print(f"[bench] snapshot rows={len(d3)}, change log rows={len(cl)}")
+    _, t = timed(lambda: pick_ids(cl, d3, k=100))
+    _, tb = timed(lambda: select_ids(cl, d3, limit=100))
+    print(f"[bench] id selection (100): loop {t:.3f}s  batch {tb:.3f}s")
+
+    for k in sizes:
+        lo, tl = timed(lambda: loop_path(cl, d3, k))
+        ba, tb = timed(lambda: batch_path(cl, d3, k))
+        same = ["cin","company_name","state","status","sector"]
+        ok = lo[same].reset_index(drop=True).equals(ba[same].reset_index(drop=True))
+        print(f"[bench] {k:>6} CINs: loop {tl:8.3f}s  batch {tb:7.3f}s  "
+              f"x{tl / max(tb, 1e-9):6.1f}  same={ok}")
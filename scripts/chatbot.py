@@ -2,6 +2,11 @@ import os, re, json
 import pandas as pd
 from pathlib import Path
 
+try:
+    from live_data import LIVE_LOG, data_version, mtime, read_live, apply_live
+except ImportError:   # imported as scripts.chatbot from the project root
+    from scripts.live_data import LIVE_LOG, data_version, mtime, read_live, apply_live
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -12,11 +17,13 @@ B = Path(__file__).resolve().parents[1]
 P_PRO = B / "data" / "processed"
 P_LOG = B / "data" / "change_logs"
 P_ENR = B / "data" / "enriched"
+BASE_FILES = [P_PRO / "master_day3.csv", P_LOG / "change_log_day2.csv",
+              P_LOG / "change_log_day3.csv", P_ENR / "enriched_dataset.csv"]
+_CACHE = {}
 
 
 # ---------------- LOAD DATA ----------------
-def load_data():
-    d3 = pd.read_csv(P_PRO / "master_day3.csv", low_memory=False)
+def _prep_d3(d3):
     for c in ["cin","company_name","company_status","state","company_class","principal_business_activity","nic_code"]:
         if c in d3.columns:
             d3[c] = d3[c].astype(str)
@@ -24,24 +31,59 @@ def load_data():
     for cap in ["authorized_capital","paid_up_capital"]:
         if cap in d3.columns:
             d3[cap] = pd.to_numeric(d3[cap], errors="coerce")
+    return d3
+
 
+def _read_logs(paths):
     cls = []
-    for p in [P_LOG / "change_log_day2.csv", P_LOG / "change_log_day3.csv"]:
+    for p in paths:
         if p.exists():
             x = pd.read_csv(p, low_memory=False)
             x.columns = [c.strip().lower() for c in x.columns]
             cls.append(x)
-    ch = pd.concat(cls, ignore_index=True) if cls else pd.DataFrame(columns=["cin","change_type","field_changed","old_value","new_value","date"])
+    return cls
+
+
+def load_base():
+    d3 = _prep_d3(pd.read_csv(BASE_FILES[0], low_memory=False))
+    cls = _read_logs(BASE_FILES[1:3])
 
     enr = pd.DataFrame()
-    pe = P_ENR / "enriched_dataset.csv"
+    pe = BASE_FILES[3]
     if pe.exists():
         enr = pd.read_csv(pe, low_memory=False)
         enr.columns = [c.strip().lower() for c in enr.columns]
 
+    return d3, cls, enr
+
+
+def _with_live(base):
+    # layer the watcher's live snapshot rows and change log over the base
+    d3, cls, enr = base
+    d3 = apply_live(d3, _prep_d3(read_live()))
+    cls = cls + _read_logs([LIVE_LOG])
+    ch = pd.concat(cls, ignore_index=True) if cls else pd.DataFrame(columns=["cin","change_type","field_changed","old_value","new_value","date"])
     return d3, ch, enr
 
 
+def load_data():
+    return _with_live(load_base())
+
+
+def load_data_cached():
+    # base files are re-read only when they change; a new data version
+    # (see watch_raw.py) only re-reads the live files
+    mt = tuple(mtime(p) for p in BASE_FILES)
+    if _CACHE.get("mtimes") != mt:
+        _CACHE.clear()
+        _CACHE["base"], _CACHE["mtimes"] = load_base(), mt
+    v = data_version()
+    if _CACHE.get("version") != v or "data" not in _CACHE:
+        _CACHE["data"], _CACHE["version"] = _with_live(_CACHE["base"]), v
+    d3, ch, enr = _CACHE["data"]
+    return d3, ch.copy(), enr
+
+
 # ---------------- RULE-BASED PARSER ----------------
 def parse_query(q: str):
     s = q.lower()
@@ -119,7 +161,7 @@ def execute(intent, filters, d3, ch, enr):
 
 # ---------------- MAIN ENTRY ----------------
 def answer_query(q: str):
-    d3, ch, enr = load_data()
+    d3, ch, enr = load_data_cached()
     intent, filters = parse_query(q)
     msg, df = execute(intent, filters, d3, ch, enr)
     return msg, df
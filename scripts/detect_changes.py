@@ -123,7 +123,7 @@ def detect_changes(prev: pd.DataFrame, curr: pd.DataFrame, date_label: str):
     common = curr_i.index.intersection(prev_i.index)
     pc = prev_i.loc[common, ["company_status","authorized_capital","paid_up_capital","company_class"]]
     cc = curr_i.loc[common, ["company_status","authorized_capital","paid_up_capital","company_class"]]
-    neq = pc != cc
+    neq = (pc != cc) & ~(pc.isna() & cc.isna())   # missing on both sides is not a change
 
     logs = []
     if not neq.empty:
@@ -1,12 +1,34 @@
-import pandas as pd, numpy as np, re, sys
+import pandas as pd, numpy as np, re, sys, os, argparse
 from pathlib import Path
 
+from live_data import LIVE_LOG, read_live, apply_live, cin_index
+
 B = Path(__file__).resolve().parents[1]
 P_PRO = B / "data" / "processed"
 P_LOG = B / "data" / "change_logs"
 P_OUT = B / "data" / "enriched"
 P_OUT.mkdir(parents=True, exist_ok=True)
 
+SOURCES = [
+    ("ZaubaCorp","https://www.zaubacorp.com/"),
+    ("API Setu (MCA)","https://apisetu.gov.in/"),
+    ("Indian Kanoon","https://indiankanoon.org/"),
+    ("GST Portal","https://www.gst.gov.in/"),
+    ("MCA21","https://www.mca.gov.in/")
+]
+# checked in order, first match wins (same rules as map_sector)
+SECTOR_RULES = [
+    (r"^0?1", "Agriculture"),
+    (r"^(10|11|12)", "Manufacturing"),
+    (r"^(49|50|51|52)", "Logistics"),
+    (r"^(61|62|63)", "IT Services"),
+    (r"^(64|65|66)", "Financial Services"),
+    (r"^85", "Education"),
+    (r"^86", "Healthcare"),
+]
+COLS_REQUIRED = ["cin","company_name","state","status","source","field","source_url"]
+DEFAULT_LIMIT = 100   # assignment sample size; 0 / None enriches every selected CIN
+
 def read_csv_lower(p):
     df = pd.read_csv(p, low_memory=False)
     df.columns = [c.strip().lower() for c in df.columns]
@@ -27,6 +49,24 @@ def pick_ids(change_log_df: pd.DataFrame, d3: pd.DataFrame, k: int):
     a = a[:max(50, min(100, k))]  # enforce 50–100 per assignment
     return a
 
+def select_ids(change_log_df: pd.DataFrame, d3: pd.DataFrame, limit=DEFAULT_LIMIT):
+    """Vectorized pick_ids: semi-join change-log CINs against the snapshot.
+
+    Keeps change-log order, falls back to the snapshot's CINs when nothing
+    joins, and caps the result at `limit` (None or 0 = no cap).
+    """
+    if limit is not None and limit < 0:
+        raise ValueError(f"limit must be >= 0, got {limit}")
+    snap = cin_index(d3["cin"].dropna()).unique()
+    if "cin" in change_log_df.columns:
+        a = cin_index(change_log_df["cin"].dropna()).unique()
+        a = a[snap.get_indexer(a) >= 0]
+    else:
+        a = snap[:0]
+    if a.empty:
+        a = snap
+    return a[:limit].to_numpy() if limit else a.to_numpy()
+
 def map_sector(nic):
     if pd.isna(nic): return "Other"
     x = str(nic)
@@ -39,16 +79,16 @@ def map_sector(nic):
     if re.match(r"^86", x): return "Healthcare"
     return "Other"
 
+def map_sectors(nic: pd.Series):
+    # whole-column map_sector
+    x = nic.astype("string")
+    conds = [x.str.match(p).fillna(False).to_numpy(dtype=bool) for p, _ in SECTOR_RULES]
+    return pd.Series(np.select(conds, [s for _, s in SECTOR_RULES], default="Other"), index=nic.index)
+
 def enrich_mock(ids, d3, seed=20251019):
     z = d3.set_index("cin")
     rng = np.random.default_rng(seed)
-    sources = [
-        ("ZaubaCorp","https://www.zaubacorp.com/"),
-        ("API Setu (MCA)","https://apisetu.gov.in/"),
-        ("Indian Kanoon","https://indiankanoon.org/"),
-        ("GST Portal","https://www.gst.gov.in/"),
-        ("MCA21","https://www.mca.gov.in/")
-    ]
+    sources = SOURCES
     out = []
     for i, cin in enumerate(ids, 1):
         if cin not in z.index: continue
@@ -70,12 +110,73 @@ def enrich_mock(ids, d3, seed=20251019):
             print(f"[enrich] {i}/{len(ids)}", flush=True)
     return pd.DataFrame(out)
 
-def main():
+def enrich_batches(ids, d3, seed=20251019, chunk=50_000):
+    """Batched enrich_mock: yields enriched frames of up to `chunk` CINs.
+
+    Rows are gathered by position and every column is built as a whole-array
+    operation; random draws are made once for all ids, so output does not
+    depend on `chunk` (the values differ from enrich_mock's per-row draws).
+    """
+    z = d3.reset_index(drop=True)
+    keys = cin_index(z["cin"])
+    # first row per CIN, like set_index().loc on a de-duplicated snapshot
+    first = ~keys.duplicated()
+    pos = keys[first].get_indexer(pd.Index(np.asarray(ids, dtype=object), dtype=object))
+    pos = np.flatnonzero(first)[pos[pos >= 0]]
+    rng = np.random.default_rng(seed)
+    src = rng.integers(0, len(SOURCES), size=len(pos))
+    director = rng.integers(1000, 9999, size=len(pos))
+    names = np.array([s[0] for s in SOURCES], dtype=object)
+    urls = np.array([s[1] for s in SOURCES], dtype=object)
+
+    def col(c, rows):
+        return rows[c].astype(str).to_numpy() if c in rows.columns else np.full(len(rows), "", dtype=object)
+
+    for i in range(0, len(pos), chunk):
+        rows = z.iloc[pos[i:i + chunk]]
+        s = src[i:i + chunk]
+        nic = rows["nic_code"] if "nic_code" in rows.columns else pd.Series(pd.NA, index=rows.index)
+        yield pd.DataFrame({
+            "cin": rows["cin"].astype(str).to_numpy(),
+            "company_name": col("company_name", rows),
+            "state": col("state", rows),
+            "status": col("company_status", rows),
+            "source": names[s],
+            "field": "profile_snapshot",
+            "source_url": urls[s],
+            "sector": map_sectors(nic).to_numpy(),
+            "director_name": pd.Series(director[i:i + chunk]).astype(str).radd("Director ").to_numpy(),
+        })
+        print(f"[enrich] {min(i + chunk, len(pos))}/{len(pos)}", flush=True)
+
+def write_batches(batches, op):
+    # chunked write to a temp file swapped in at the end; the full enriched
+    # set is never held in memory and readers never see a partial file
+    n = 0
+    tmp = op.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    for df in batches:
+        # order to exactly match assignment + extras last
+        df = df[COLS_REQUIRED + [c for c in df.columns if c not in COLS_REQUIRED]]
+        df.to_csv(tmp, mode="a", index=False, header=(n == 0))
+        n += len(df)
+    if n == 0:
+        pd.DataFrame(columns=COLS_REQUIRED).to_csv(tmp, index=False)
+    os.replace(tmp, op)
+    return n
+
+def main(limit=DEFAULT_LIMIT, chunk=50_000):
     # load day3
     p3 = P_PRO / "master_day3.csv"
     if not p3.exists():
         sys.exit("master_day3.csv not found. Run Task B first.")
     d3 = read_csv_lower(p3)
+    # rows ingested by watch mode override Day3, as in the app and chatbot
+    live = read_live()
+    if not live.empty:
+        live.columns = [c.strip().lower() for c in live.columns]
+        d3 = apply_live(d3, live)
+        print(f"[enrich] layered {len(live)} live snapshot rows", flush=True)
     for c in ["cin","company_name","company_status","state","nic_code"]:
         if c in d3.columns: d3[c] = d3[c].astype(str)
 
@@ -88,24 +189,29 @@ def main():
         print("[enrich] using change_log_day2.csv", flush=True)
     else:
         cl = pd.DataFrame({"cin": []})
+    # watch-mode changes go first so the freshest CINs survive --limit
+    if LIVE_LOG.exists():
+        cl = pd.concat([read_csv_lower(LIVE_LOG), cl], ignore_index=True)
+        print("[enrich] using change_log_live.csv", flush=True)
+    if cl.empty:
         print("[enrich] no change logs found; falling back to day3 sample", flush=True)
 
-    ids = pick_ids(cl, d3, k=100)
-    if not ids:
+    ids = select_ids(cl, d3, limit=limit)
+    if not len(ids):
         sys.exit("No CINs available to enrich (even after fallback).")
 
     print(f"[enrich] selected {len(ids)} CINs", flush=True)
-    df = enrich_mock(ids, d3)
-
-    # order/rename to exactly match assignment + extras last
-    cols_required = ["cin","company_name","state","status","source","field","source_url"]
-    for c in cols_required:
-        if c not in df.columns: df[c] = pd.NA
-    df = df[cols_required + [c for c in df.columns if c not in cols_required]]
-
     op = P_OUT / "enriched_dataset.csv"
-    df.to_csv(op, index=False)
-    print(f"[enrich] wrote {op} rows={len(df)}", flush=True)
+    n = write_batches(enrich_batches(ids, d3, chunk=chunk), op)
+    print(f"[enrich] wrote {op} rows={n}", flush=True)
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Enrich changed CINs from the Day3 snapshot.")
+    ap.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="max CINs to enrich (0 = all)")
+    ap.add_argument("--chunk", type=int, default=50_000, help="CINs per write batch")
+    a = ap.parse_args()
+    if a.limit < 0:
+        ap.error("--limit must be >= 0")
+    if a.chunk <= 0:
+        ap.error("--chunk must be > 0")
+    main(a.limit, a.chunk)
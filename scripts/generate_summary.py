@@ -8,6 +8,10 @@ OUT.mkdir(parents=True, exist_ok=True)
 
 def summarize_log(p, date):
     df = pd.read_csv(p, low_memory=False)
+    return summarize_frame(df, date)
+
+def summarize_frame(df, date):
+    df = df.copy()
     df.columns = [c.strip().lower() for c in df.columns]
     new = (df["change_type"] == "New Incorporation").sum() if "change_type" in df.columns else 0
     dereg = (df["change_type"] == "Deregistered").sum() if "change_type" in df.columns else 0
@@ -0,0 +1,39 @@
+import pandas as pd
+from pathlib import Path
+
+# ---------- paths ----------
+B = Path(__file__).resolve().parents[1]
+P_PRO = B / "data" / "processed"
+P_LOG = B / "data" / "change_logs"
+LIVE_SNAPSHOT = P_PRO / "master_live.csv"      # append-only rows written by watch_raw.py
+LIVE_LOG = P_LOG / "change_log_live.csv"       # changes detected from incremental drops
+P_STAMP = B / "data" / ".data_version"         # bumped by watch_raw.py after each refresh
+
+
+def data_version():
+    return P_STAMP.read_text().strip() if P_STAMP.exists() else ""
+
+
+def mtime(p):
+    return p.stat().st_mtime if p.exists() else 0.0
+
+
+def cin_index(s):
+    # object-dtype hash index (arrow-backed string isin is per-element Python)
+    return pd.Index(s.astype(str).to_numpy(dtype=object), dtype=object)
+
+
+def read_live(**kw):
+    if not LIVE_SNAPSHOT.exists(): return pd.DataFrame()
+    return pd.read_csv(LIVE_SNAPSHOT, low_memory=False, **kw)
+
+
+def apply_live(base, live):
+    """Layer live snapshot rows over a base snapshot; the last row per CIN wins.
+
+    Costs one pass over the base in memory; the base CSV is never rewritten.
+    """
+    if live.empty or "cin" not in base.columns: return base
+    live = live.drop_duplicates(subset=["cin"], keep="last")
+    keep = ~cin_index(base["cin"]).isin(cin_index(live["cin"]))
+    return pd.concat([base[keep], live.reindex(columns=base.columns)], ignore_index=True)
@@ -0,0 +1,146 @@
+import pandas as pd, numpy as np
+from pathlib import Path
+
+try:
+    import pyarrow as pa, pyarrow.parquet as pq
+except Exception:
+    pq = None
+
+# label -> column; only columns present in the frame are offered
+SORTS = {
+    "Authorized capital": "authorized_capital",
+    "Paid-up capital": "paid_up_capital",
+    "Incorporation date": "date_of_incorporation",
+    "Company name": "company_name",
+}
+
+# ---------- helpers ----------
+def _sort_key(s: pd.Series):
+    if s.name in ("authorized_capital", "paid_up_capital"):
+        return pd.to_numeric(s, errors="coerce")
+    if s.name == "date_of_incorporation":
+        return pd.to_datetime(s, errors="coerce")
+    return s.astype("string").str.strip().str.upper().replace("NAN", pd.NA)
+
+# ---------- full-frame view ----------
+class ResultView:
+    """Holds a frame plus presorted orderings of it.
+
+    An ordering is computed once per (column, direction) for the whole frame:
+    `order` lists row ids in sort order (missing values last, ties by row id)
+    and `rank` is its inverse. Selections are row-id arrays, so sorting one is
+    a gather of integer ranks and never touches the frame itself.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        self._orders = {}
+
+    def sorts(self):
+        return {k: v for k, v in SORTS.items() if v in self.df.columns}
+
+    def ordering(self, col=None, descending=False):
+        if col is None:
+            n = len(self.df)
+            return np.arange(n), np.arange(n)
+        key = (col, descending)
+        if key not in self._orders:
+            # dense sorted codes; missing values are -1
+            codes, _ = pd.factorize(_sort_key(self.df[col]), sort=True)
+            valid = np.flatnonzero(codes >= 0)
+            cv = codes[valid]
+            vo = valid[np.lexsort((valid, -cv if descending else cv))]
+            order = np.concatenate([vo, np.flatnonzero(codes < 0)])
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            self._orders[key] = (order, rank)
+        return self._orders[key]
+
+    def select(self, mask=None):
+        idx = np.arange(len(self.df)) if mask is None else np.flatnonzero(np.asarray(mask, dtype=bool))
+        return Selection(self, idx)
+
+# ---------- filtered selection ----------
+class Selection:
+    """A filtered subset of a ResultView, kept as row ids (natural order)."""
+
+    def __init__(self, view: ResultView, idx: np.ndarray):
+        self.view = view
+        self.idx = idx
+        self._sorted = {}
+
+    def __len__(self):
+        return len(self.idx)
+
+    def _ranks(self, col, descending):
+        # sorted ranks of the selection under one ordering, cached per selection
+        key = (col, descending)
+        if key not in self._sorted:
+            _, rank = self.view.ordering(col, descending)
+            self._sorted[key] = np.sort(rank[self.idx])
+        return self._sorted[key]
+
+    def rows(self, col=None, descending=False):
+        order, _ = self.view.ordering(col, descending)
+        return order[self._ranks(col, descending)]
+
+    def n_pages(self, size):
+        return max(1, -(-len(self.idx) // size))
+
+    def page(self, n, size=100, col=None, descending=False):
+        """Rows of page `n` (0-based) under the given sort."""
+        order, _ = self.view.ordering(col, descending)
+        r = self._ranks(col, descending)[n * size:(n + 1) * size]
+        return self.view.df.iloc[order[r]]
+
+    def after(self, cursor=None, size=100, col=None, descending=False):
+        """Keyset page: rows strictly after `cursor`; returns (frame, next_cursor).
+
+        The cursor is a position in the view-wide ordering, so it stays valid
+        when the filter changes underneath it.
+        """
+        order, _ = self.view.ordering(col, descending)
+        r = self._ranks(col, descending)
+        start = 0 if cursor is None else int(np.searchsorted(r, cursor, side="right"))
+        r = r[start:start + size]
+        nxt = int(r[-1]) if len(r) and start + size < len(self._ranks(col, descending)) else None
+        return self.view.df.iloc[order[r]], nxt
+
+    def iter_chunks(self, chunk=50_000, col=None, descending=False):
+        rows = self.rows(col, descending)
+        for i in range(0, len(rows), chunk):
+            yield self.view.df.iloc[rows[i:i + chunk]]
+
+    # ---------- export ----------
+    def to_csv(self, path, chunk=50_000, col=None, descending=False):
+        """Write the full selection chunk by chunk; returns rows written."""
+        path = Path(path); path.parent.mkdir(parents=True, exist_ok=True)
+        n = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            for i, part in enumerate(self.iter_chunks(chunk, col, descending)):
+                part.to_csv(f, index=False, header=(i == 0))
+                n += len(part)
+            if n == 0:
+                self.view.df.head(0).to_csv(f, index=False)
+        return n
+
+    def to_parquet(self, path, chunk=50_000, col=None, descending=False):
+        """Columnar export, one row group per chunk (needs pyarrow)."""
+        if pq is None:
+            raise RuntimeError("pyarrow is not installed; use to_csv instead.")
+        path = Path(path); path.parent.mkdir(parents=True, exist_ok=True)
+        schema = pa.Schema.from_pandas(_arrow_safe(self.view.df.head(0)), preserve_index=False)
+        n = 0
+        with pq.ParquetWriter(path, schema) as w:
+            for part in self.iter_chunks(chunk, col, descending):
+                w.write_table(pa.Table.from_pandas(_arrow_safe(part), schema=schema, preserve_index=False))
+                n += len(part)
+        return n
+
+def _arrow_safe(df):
+    # mixed-type object columns (common after read_csv) are written as strings
+    df = df.copy()
+    for c in df.columns:
+        if df[c].dtype == object:
+            df[c] = df[c].astype("string")
+    return df
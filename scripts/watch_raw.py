@@ -0,0 +1,259 @@
+import pandas as pd, numpy as np, json, time, os, hashlib, argparse
+from pathlib import Path
+
+from integrate_data import normalize_chunk, CANON
+from detect_changes import detect_changes
+from generate_summary import summarize_frame
+from live_data import LIVE_SNAPSHOT, LIVE_LOG, P_STAMP, mtime, read_live
+
+# ---------- paths ----------
+B = Path(__file__).resolve().parents[1]
+P_RAW = B / "data" / "raw"
+P_PRO = B / "data" / "processed"
+P_LOG = B / "data" / "change_logs"
+P_SUM = B / "data"
+SNAPSHOT = P_PRO / "master_day3.csv"           # base snapshot; drops layer over it via LIVE_SNAPSHOT
+MANIFEST = P_PRO / "raw_manifest.json"         # processed raw files: path, size, hash
+LOG_COLS = ["cin","change_type","field_changed","old_value","new_value","date"]
+
+# ---------- manifest ----------
+def file_hash(p, block=1 << 20):
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        for b in iter(lambda: f.read(block), b""):
+            h.update(b)
+    return h.hexdigest()
+
+def load_manifest():
+    if not MANIFEST.exists(): return None
+    return json.loads(MANIFEST.read_text())
+
+def save_manifest(m):
+    tmp = MANIFEST.with_suffix(".tmp")
+    tmp.write_text(json.dumps(m, indent=2))
+    os.replace(tmp, MANIFEST)
+
+def _entry(p, digest, rows=None):
+    st = p.stat()
+    return {"size": st.st_size, "mtime": st.st_mtime, "sha256": digest,
+            "rows": rows, "processed_at": pd.Timestamp.now().isoformat(timespec="seconds")}
+
+def log_failure(failed, key, e):
+    # failed files stay out of the manifest and are retried; log each error once
+    msg = f"{type(e).__name__}: {e}"
+    if failed.get(key) != msg:
+        print(f"[watch] {key} failed, will retry: {msg}", flush=True)
+    failed[key] = msg
+
+def seed_manifest():
+    # first run: everything already in data/raw was part of the full rebuild
+    m = {}
+    for p in sorted(P_RAW.glob("*.csv")):
+        try:
+            m[str(p.relative_to(B))] = _entry(p, file_hash(p))
+        except OSError as e:
+            print(f"[watch] {p.name} not seeded: {type(e).__name__}: {e}", flush=True)
+    save_manifest(m)
+    print(f"[watch] seeded manifest with {len(m)} existing raw files", flush=True)
+    return m
+
+def pending_files(m, seen, failed):
+    # size/mtime first so unchanged files are never re-hashed
+    known = {e["sha256"] for e in m.values()}
+    out, dirty = [], False
+    for p in sorted(P_RAW.glob("*.csv")):
+        key = str(p.relative_to(B))
+        try:
+            st = p.stat()
+            e = m.get(key)
+            if e and e["size"] == st.st_size and e["mtime"] == st.st_mtime:
+                continue
+            # only pick up a file once size/mtime held still across two polls
+            # (a copy into data/raw/ may still be in progress)
+            stat, seen[key] = seen.get(key), (st.st_size, st.st_mtime)
+            if stat != seen[key] or st.st_size == 0:
+                continue
+            digest = file_hash(p)
+            if e and e["sha256"] == digest:
+                m[key] = _entry(p, digest, e.get("rows"))     # touched, same content
+                dirty = True
+                continue
+            if digest in known:
+                m[key] = _entry(p, digest, 0)                 # duplicate of a processed drop
+                dirty = True
+                print(f"[watch] {key} duplicates an already processed file, skipping", flush=True)
+                continue
+        except OSError as ex:
+            # vanished, unreadable or not a regular file
+            log_failure(failed, key, ex)
+            continue
+        out.append((p, key, digest))
+    return out, dirty
+
+# ---------- snapshot ----------
+class Snapshot:
+    """Base snapshot plus the live rows appended by earlier drops.
+
+    Each drop only appends its merged rows to LIVE_SNAPSHOT, so the cost per
+    drop follows the drop size. Both files are reloaded when their mtimes
+    change underneath us (e.g. detect_changes.py rerun while watching). A base
+    newer than the live files is a full rebuild, and run() resets the live
+    layer (see reset_live) before the next drop.
+    """
+
+    def __init__(self):
+        self.stamp = None
+        self.reload_if_changed()
+
+    def _mtimes(self):
+        return (mtime(SNAPSHOT), mtime(LIVE_SNAPSHOT))
+
+    def reload_if_changed(self):
+        if self.stamp == self._mtimes(): return
+        base = pd.read_csv(SNAPSHOT, dtype="object", low_memory=False)
+        self.base = base.drop_duplicates(subset=["cin"], keep="last").set_index("cin", drop=False)
+        live = read_live(dtype="object")
+        if not live.empty:
+            live = live.drop_duplicates(subset=["cin"], keep="last").set_index("cin", drop=False)
+        self.live = live.reindex(columns=self.base.columns)
+        # appends must follow the live file's own header, even after a base rebuild
+        self.live_cols = list(live.columns) if len(live.columns) else list(self.base.columns)
+        self.stamp = self._mtimes()
+        print(f"[watch] loaded snapshot rows={len(self.base)}, live rows={len(self.live)}", flush=True)
+
+    def lookup(self, cins):
+        # current rows for `cins`: live value if a drop touched it, else base
+        in_live = cins.intersection(self.live.index)
+        in_base = cins.difference(in_live).intersection(self.base.index)
+        return pd.concat([self.live.loc[in_live], self.base.loc[in_base]])
+
+    def append(self, rows):
+        rows.reindex(columns=self.live_cols).to_csv(
+            LIVE_SNAPSHOT, mode="a", index=False, header=not LIVE_SNAPSHOT.exists())
+        rows = rows.reindex(columns=self.base.columns)
+        self.live = pd.concat([self.live.drop(index=rows.index.intersection(self.live.index)), rows])
+        self.stamp = self._mtimes()
+
+def normalize_file(p):
+    frames = []
+    for c in pd.read_csv(p, chunksize=200_000, low_memory=False, encoding_errors="ignore"):
+        if not {h.strip().lower().replace(" ","_") for h in c.columns} & set(CANON["cin"]):
+            raise ValueError("no CIN column")
+        frames.append(normalize_chunk(c))
+    if not frames: return pd.DataFrame(columns=["cin"])
+    df = pd.concat(frames, ignore_index=True)
+    df = df[df["cin"].notna() & ~df["cin"].isin(["", "NAN", "<NA>"])]
+    # last occurrence wins inside a single drop
+    df = df.drop_duplicates(subset=["cin"], keep="last")
+    # match the snapshot's on-disk (object/NaN) representation so diffs are value-only
+    df["date_of_incorporation"] = df["date_of_incorporation"].dt.strftime("%Y-%m-%d")
+    return df.astype(object).where(df.notna(), np.nan).set_index("cin", drop=False)
+
+def merge_by_cin(prev, new, day, cols):
+    # merged rows for the drop's CINs; nothing is modified in place
+    new = new.reindex(columns=cols)
+    new["snapshot_date"] = day
+    common = new.index.intersection(prev.index)
+    added = new.index.difference(prev.index)
+    # fields missing from the drop keep their current values
+    upd = new.loc[common].combine_first(prev.loc[common])[cols]
+    return upd, new.loc[added]
+
+# ---------- refresh ----------
+def append_live_log(cl):
+    if cl.empty: return
+    cl = cl.reindex(columns=LOG_COLS)
+    cl.to_csv(LIVE_LOG, mode="a", index=False, header=not LIVE_LOG.exists())
+
+def refresh_summary(day, cl, summaries):
+    # add this drop's counts to the day's running totals (picked up from the
+    # JSON after a restart) instead of re-reading the whole live log
+    out = P_SUM / f"daily_summary_{day}.json"
+    if day not in summaries:
+        summaries[day] = json.loads(out.read_text()) if out.exists() else \
+            summarize_frame(pd.DataFrame(columns=LOG_COLS), day)
+    s = summaries[day]
+    for k, v in summarize_frame(cl, day).items():
+        if k != "date": s[k] = int(s.get(k, 0)) + v
+    tmp = out.with_suffix(".tmp")
+    tmp.write_text(json.dumps(s, indent=2))
+    os.replace(tmp, out)
+    return s
+
+def bump_version():
+    P_STAMP.write_text(str(time.time_ns()))
+
+def needs_reset():
+    # a full rebuild newer than the live layer already includes those drops
+    live = [mtime(p) for p in (LIVE_SNAPSHOT, LIVE_LOG) if p.exists()]
+    return bool(live) and mtime(SNAPSHOT) > max(live)
+
+def reset_live():
+    """Drop the live layer and its summaries, then reseed the manifest."""
+    days = set()
+    if LIVE_LOG.exists():
+        days = set(pd.read_csv(LIVE_LOG, usecols=["date"])["date"].dropna().astype(str))
+    for d in days:
+        (P_SUM / f"daily_summary_{d}.json").unlink(missing_ok=True)
+    LIVE_SNAPSHOT.unlink(missing_ok=True)
+    LIVE_LOG.unlink(missing_ok=True)
+    print(f"[watch] reset live layer ({len(days)} live summaries removed)", flush=True)
+    m = seed_manifest()
+    bump_version()
+    return m
+
+def ingest(p, key, digest, snap, m, summaries):
+    t0 = time.perf_counter()
+    day = pd.Timestamp.now().strftime("%Y-%m-%d")
+    new = normalize_file(p)
+    # diff only the CINs this drop touches
+    prev = snap.lookup(new.index)
+    upd, added = merge_by_cin(prev, new, day, snap.base.columns)
+    curr = pd.concat([upd, added])
+    cl, _ = detect_changes(prev.reset_index(drop=True), curr.reset_index(drop=True), day)
+
+    snap.append(curr)
+    append_live_log(cl)
+    s = refresh_summary(day, cl, summaries)
+    m[key] = _entry(p, digest, int(len(new)))
+    save_manifest(m)
+    bump_version()
+    print(f"[watch] {key}: {len(new)} rows ({len(added)} new, {len(upd)} merged), "
+          f"{len(cl)} changes, summary={s} in {time.perf_counter() - t0:.2f}s", flush=True)
+
+def run(interval=5.0, once=False, reset=False):
+    if not SNAPSHOT.exists():
+        raise SystemExit(f"{SNAPSHOT.name} not found. Run integrate_data.py / detect_changes.py first.")
+    m = load_manifest()
+    if reset or needs_reset(): m = reset_live()
+    if m is None: m = seed_manifest()
+    snap = Snapshot()
+    print(f"[watch] watching {P_RAW}", flush=True)
+    seen, failed, summaries = {}, {}, {}
+    if once:
+        pending_files(m, seen, failed)      # first look; files must be stable on the next one
+        time.sleep(min(interval, 2.0))
+    while True:
+        if needs_reset():
+            m = reset_live()
+            seen.clear(); failed.clear(); summaries.clear()
+        todo, dirty = pending_files(m, seen, failed)
+        for p, key, digest in todo:
+            try:
+                snap.reload_if_changed()
+                ingest(p, key, digest, snap, m, summaries)
+                failed.pop(key, None)
+            except Exception as e:
+                log_failure(failed, key, e)
+        if dirty and not todo: save_manifest(m)
+        if once: break
+        time.sleep(interval)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Incrementally ingest new raw MCA drops.")
+    ap.add_argument("--interval", type=float, default=5.0, help="poll interval in seconds")
+    ap.add_argument("--once", action="store_true", help="process pending files and exit")
+    ap.add_argument("--reset", action="store_true",
+                    help="drop the live layer and reseed the manifest before watching")
+    a = ap.parse_args()
+    run(a.interval, a.once, a.reset)